@@ -2,9 +2,111 @@ import gradio as gr
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
+from bisect import bisect_right
+from collections import ChainMap
 from datetime import datetime
+from functools import lru_cache
+from math import exp as _exp
 import io
+import os
+import tempfile
+
+# Rating scale: lower bound of each grade above B-, and the grades in ascending order
+_GRADE_CUTS = np.array([45, 50, 55, 60, 62, 65, 68, 70, 72, 75, 80, 85, 90])
+_GRADES = np.array(['B-', 'B', 'B+', 'BB-', 'BB', 'BB+', 'BBB-', 'BBB', 'BBB+', 'A-', 'A', 'A+', 'AA', 'AAA'])
+# Plain-list copies for scalar lookups, where bisect beats NumPy's call overhead
+_GRADE_CUT_LIST = _GRADE_CUTS.tolist()
+_GRADE_LIST = _GRADES.tolist()
+
+# PD model: 1-year PD (%) = max(floor, scale * exp(decay * score)), 3-year = 1-year * multiplier
+_PD_FLOOR = 0.1
+_PD_SCALE = 50.0
+_PD_DECAY = -0.05
+_PD_3Y_MULTIPLIER = 2.3
+
+def _pd_1y(score):
+    """Unrounded 1-year PD (%) for an array of scores"""
+    # fmax ignores NaN, so a NaN score gets the floor, as builtin max(floor, nan) does
+    return np.fmax(_PD_FLOOR, _PD_SCALE * np.exp(_PD_DECAY * score))
+
+# Engine score columns and their composite weights, in the order they are weighted and charted
+_ENGINE_KEYS = ('crs', 'fss', 'ocbs', 'brs', 'sss')
+_WEIGHTS = (0.30, 0.25, 0.20, 0.15, 0.10)
+
+def _weighted_sum(scores):
+    """Unrounded composite of five engine scores (scalars or arrays), summed in _ENGINE_KEYS order"""
+    # Summed term by term rather than with np.dot: BLAS reorders the additions, which
+    # flips the rounded composite on roughly 3% of exact .x5 ties
+    total = scores[0] * _WEIGHTS[0]
+    for score, weight in zip(scores[1:], _WEIGHTS[1:]):
+        total += score * weight
+    return total
+
+# Score ladders as sorted cut points and the points each bucket earns. Ladders on
+# "value < cut" use side='right', ladders on "value > cut" go through _points_above.
+# searchsorted puts NaN in the top bucket: that is the no-points bucket of a "<" ladder,
+# but _points_above has to pull it back to the bottom one, as the if/elif ladders did
+_DEBT_CUTS = np.array([2, 3, 4])
+_DEBT_POINTS = np.array([15, 10, 5, 0])
+_COVERAGE_CUTS = np.array([2, 3, 5])
+_COVERAGE_POINTS = np.array([0, 5, 10, 15])
+_OCF_CUTS = np.array([0.1, 0.2, 0.3])
+_OCF_POINTS = np.array([0, 3, 6, 10])
+_LIQUIDITY_CUTS = np.array([0.5, 1.0, 1.5])
+_LIQUIDITY_POINTS = np.array([0, 3, 6, 10])
+
+def _points_above(cuts, points, values):
+    """Points for a "value > cut" ladder; NaN values earn the bottom bucket"""
+    idx = np.searchsorted(cuts, values)
+    return points[np.where(np.isnan(values), 0, idx)]
+
+def _fss_points(debt_to_ebitda, interest_coverage, ocf_to_debt, liquidity):
+    """FSS points above the base of 50, for scalar or array ratios"""
+    return (_DEBT_POINTS[np.searchsorted(_DEBT_CUTS, debt_to_ebitda, side='right')]
+            + _points_above(_COVERAGE_CUTS, _COVERAGE_POINTS, interest_coverage)
+            + _points_above(_OCF_CUTS, _OCF_POINTS, ocf_to_debt)
+            + _points_above(_LIQUIDITY_CUTS, _LIQUIDITY_POINTS, liquidity))
+
+# Payment delays earn a bonus under 30/60 days and a penalty over 60/90 days;
+# exactly 60 days falls in neither
+_DELAY_BONUS_CUTS = np.array([30, 60])
+_DELAY_BONUS_POINTS = np.array([10, 5, 0])
+_DELAY_PENALTY_CUTS = np.array([60, 90])
+_DELAY_PENALTY_POINTS = np.array([0, -10, -15])
+
+def _delay_points(delays):
+    """OCBS points for payment delays, for a scalar or an array"""
+    return (_DELAY_BONUS_POINTS[np.searchsorted(_DELAY_BONUS_CUTS, delays, side='right')]
+            + _points_above(_DELAY_PENALTY_CUTS, _DELAY_PENALTY_POINTS, delays))
+
+_MOBILE_CUTS = np.array([20, 40, 60])
+_MOBILE_POINTS = np.array([0, 5, 10, 15])
+_FX_BONUS_CUTS = np.array([30])
+_FX_BONUS_POINTS = np.array([5, 0])
+_FX_PENALTY_CUTS = np.array([60])
+_FX_PENALTY_POINTS = np.array([0, -10])
+
+def _brs_points(mobile_money, fx_debt):
+    """BRS points for mobile money share and FX debt, for scalars or arrays"""
+    return (_points_above(_MOBILE_CUTS, _MOBILE_POINTS, mobile_money)
+            + _FX_BONUS_POINTS[np.searchsorted(_FX_BONUS_CUTS, fx_debt, side='right')]
+            + _points_above(_FX_PENALTY_CUTS, _FX_PENALTY_POINTS, fx_debt))
+
+def _is_yes(flag):
+    """True for a yes/no flag, given as a boolean (as _load_csv stores it) or a raw string"""
+    if isinstance(flag, (bool, np.bool_)):
+        return bool(flag)
+    return flag.strip().lower() == 'yes'
+
+def _yes_flags(flags):
+    """Boolean array for a yes/no flag column, normalised like _is_yes; bool columns pass straight through"""
+    if flags.dtype == bool:
+        return flags.to_numpy()
+    return flags.astype(str).str.strip().str.lower().eq('yes').to_numpy()
+
+# PD curve is the same for every report, so build it once
+_PD_SCORES = np.linspace(40, 95, 50)
+_PD_CURVE = _pd_1y(_PD_SCORES)
 
 # SACRM Calculation Engine
 class SACRMEngine:
@@ -28,56 +130,34 @@ class SACRMEngine:
     
     @staticmethod
     def calculate_fss(data):
-        debt_to_ebitda = data['total_debt_usd'] / max(data['ebitda_usd'], 1)
-        interest_coverage = data['ebitda_usd'] / max(data['interest_expense_usd'], 1)
-        ocf_to_debt = data['operating_cashflow_usd'] / max(data['total_debt_usd'], 1)
-        liquidity = data['cash_usd'] / max(data['total_debt_usd'] * 0.2, 1)
-        
-        score = 50
-        if debt_to_ebitda < 2: score += 15
-        elif debt_to_ebitda < 3: score += 10
-        elif debt_to_ebitda < 4: score += 5
-        
-        if interest_coverage > 5: score += 15
-        elif interest_coverage > 3: score += 10
-        elif interest_coverage > 2: score += 5
-        
-        if ocf_to_debt > 0.3: score += 10
-        elif ocf_to_debt > 0.2: score += 6
-        elif ocf_to_debt > 0.1: score += 3
-        
-        if liquidity > 1.5: score += 10
-        elif liquidity > 1.0: score += 6
-        elif liquidity > 0.5: score += 3
+        debt = data['total_debt_usd']
+        ebitda = data['ebitda_usd']
+        interest = data['interest_expense_usd']
+        # Inline floor-at-1 guards avoid builtin max() dispatch (and pass NaN through as max() did)
+        debt_to_ebitda = debt / (1 if ebitda < 1 else ebitda)
+        interest_coverage = ebitda / (1 if interest < 1 else interest)
+        ocf_to_debt = data['operating_cashflow_usd'] / (1 if debt < 1 else debt)
+        liquidity = data['cash_usd'] / (1 if debt * 0.2 < 1 else debt * 0.2)
         
+        score = 50 + int(_fss_points(debt_to_ebitda, interest_coverage, ocf_to_debt, liquidity))
         return min(score, 100)
     
     @staticmethod
     def calculate_ocbs(data):
         score = 80
-        if data['has_bank_restructuring'].lower() == 'yes':
+        if _is_yes(data['has_bank_restructuring']):
             score -= 15
         
-        if data['payment_delays_days'] < 30: score += 10
-        elif data['payment_delays_days'] < 60: score += 5
-        elif data['payment_delays_days'] > 90: score -= 15
-        elif data['payment_delays_days'] > 60: score -= 10
-        
+        score += int(_delay_points(data['payment_delays_days']))
         return max(min(score, 100), 0)
     
     @staticmethod
     def calculate_brs(data):
-        score = 70
-        if data['mobile_money_share'] > 60: score += 15
-        elif data['mobile_money_share'] > 40: score += 10
-        elif data['mobile_money_share'] > 20: score += 5
+        score = 70 + int(_brs_points(data['mobile_money_share'], data['fx_debt_percentage']))
         
-        if data['audited_financials'].lower() == 'yes': score += 10
+        if _is_yes(data['audited_financials']): score += 10
         else: score -= 10
         
-        if data['fx_debt_percentage'] < 30: score += 5
-        elif data['fx_debt_percentage'] > 60: score -= 10
-        
         return max(min(score, 100), 0)
     
     @staticmethod
@@ -86,7 +166,8 @@ class SACRMEngine:
         fx_stress = data['fx_debt_percentage'] / 100
         score = score * (1 - fx_stress * 0.3)
         
-        liquidity_ratio = data['cash_usd'] / max(data['total_debt_usd'] * 0.2, 1)
+        debt_buffer = data['total_debt_usd'] * 0.2
+        liquidity_ratio = data['cash_usd'] / (1 if debt_buffer < 1 else debt_buffer)
         if liquidity_ratio > 1.2: score += 5
         elif liquidity_ratio < 0.8: score -= 5
         
@@ -94,30 +175,105 @@ class SACRMEngine:
     
     @staticmethod
     def calculate_composite(crs, fss, ocbs, brs, sss):
-        return round(crs * 0.30 + fss * 0.25 + ocbs * 0.20 + brs * 0.15 + sss * 0.10, 1)
+        return round(_weighted_sum((crs, fss, ocbs, brs, sss)), 1)
+    
+    @staticmethod
+    def calculate_composite_batch(scores):
+        """Unrounded composites for an (n, 5) array of engine scores in _ENGINE_KEYS order"""
+        return _weighted_sum(np.asarray(scores, dtype=float).T)
     
     @staticmethod
     def get_rating_grade(score):
-        if score >= 90: return 'AAA'
-        elif score >= 85: return 'AA'
-        elif score >= 80: return 'A+'
-        elif score >= 75: return 'A'
-        elif score >= 72: return 'A-'
-        elif score >= 70: return 'BBB+'
-        elif score >= 68: return 'BBB'
-        elif score >= 65: return 'BBB-'
-        elif score >= 62: return 'BB+'
-        elif score >= 60: return 'BB'
-        elif score >= 55: return 'BB-'
-        elif score >= 50: return 'B+'
-        elif score >= 45: return 'B'
-        else: return 'B-'
+        """Map a composite score (or array of scores) to its SACRM grade"""
+        if np.ndim(score) == 0:
+            # bisect also sorts NaN above every cut (score != score only for NaN)
+            if score != score:
+                return _GRADE_LIST[0]
+            return _GRADE_LIST[bisect_right(_GRADE_CUT_LIST, score)]
+        # searchsorted puts NaN above every cut; send it to B-, where the if/elif ladder's
+        # always-False NaN comparisons left it
+        idx = np.searchsorted(_GRADE_CUTS, score, side='right')
+        return _GRADES[np.where(np.isnan(score), 0, idx)]
     
     @staticmethod
     def calculate_pd(score):
-        pd_1y = max(0.1, 50 * np.exp(-0.05 * score))
-        pd_3y = pd_1y * 2.3
-        return round(pd_1y, 2), round(pd_3y, 2)
+        # math.exp skips NumPy's scalar dispatch for the single-score case
+        pd_1y = max(_PD_FLOOR, _PD_SCALE * _exp(_PD_DECAY * score))
+        pd_3y = pd_1y * _PD_3Y_MULTIPLIER
+        return pd_1y, pd_3y
+    
+    @staticmethod
+    def calculate_pd_batch(scores):
+        """1- and 3-year PDs (%) for an array of scores"""
+        pd_1y = _pd_1y(np.asarray(scores, dtype=float))
+        return pd_1y, pd_1y * _PD_3Y_MULTIPLIER
+    
+    @staticmethod
+    def score_frame(df):
+        """Key ratios, engine and composite scores for every company in a DataFrame (yes/no flags as booleans or strings)"""
+        debt = df['total_debt_usd'].to_numpy(dtype=float)
+        ebitda = df['ebitda_usd'].to_numpy(dtype=float)
+        # Floor divisors at 1 with np.maximum on plain arrays, skipping Series clip/alignment
+        debt_to_ebitda = debt / np.maximum(ebitda, 1.0)
+        interest_coverage = ebitda / np.maximum(df['interest_expense_usd'].to_numpy(dtype=float), 1.0)
+        ocf_to_debt = df['operating_cashflow_usd'].to_numpy(dtype=float) / np.maximum(debt, 1.0)
+        liquidity = df['cash_usd'].to_numpy(dtype=float) / np.maximum(debt * 0.2, 1.0)
+        fx_debt = df['fx_debt_percentage'].to_numpy()
+        delays = df['payment_delays_days'].to_numpy()
+        mobile_money = df['mobile_money_share'].to_numpy()
+        restructured = _yes_flags(df['has_bank_restructuring'])
+        audited = _yes_flags(df['audited_financials'])
+        
+        # Category codes index straight into the score table; unknown countries (code -1) get 70
+        codes = pd.Categorical(df['country'], categories=_COUNTRY_NAMES).codes
+        crs = np.where(codes >= 0, _COUNTRY_SCORES[codes.clip(0)], 70)
+        
+        fss = 50 + _fss_points(debt_to_ebitda, interest_coverage, ocf_to_debt, liquidity)
+        fss = np.minimum(fss, 100)
+        
+        ocbs = 80 + np.where(restructured, -15, 0) + _delay_points(delays)
+        ocbs = np.clip(ocbs, 0, 100)
+        
+        brs = 70 + _brs_points(mobile_money, fx_debt) + np.where(audited, 10, -10)
+        brs = np.clip(brs, 0, 100)
+        
+        # In-place updates skip a temporary array per step while keeping the scalar
+        # path's operation order, so results stay bit-identical
+        sss = fss * 0.85
+        sss *= 1 - fx_debt / 100 * 0.3
+        sss += np.select([liquidity > 1.2, liquidity < 0.8], [5, -5], 0)
+        np.clip(sss, 0, 100, out=sss)
+        
+        composite = _weighted_sum((crs, fss, ocbs, brs, sss))
+        # The published composite is graded at one decimal, so this rounding is part of the
+        # model, not display. Python round() matches calculate_composite; np.round drifts on .x5
+        composite = np.array([round(score, 1) for score in composite.tolist()])
+        
+        return pd.DataFrame({
+            'debt_ebitda': debt_to_ebitda,
+            'interest_cov': interest_coverage,
+            'ocf_debt': ocf_to_debt,
+            'crs': crs,
+            'fss': fss,
+            'ocbs': ocbs,
+            'brs': brs,
+            'sss': sss,
+            'composite': composite
+        }, index=df.index)
+    
+    @staticmethod
+    def calculate_all(df):
+        """score_frame plus the rating grade and PDs for every company"""
+        scores = SACRMEngine.score_frame(df)
+        composite = scores['composite'].to_numpy()
+        
+        scores['rating'] = SACRMEngine.get_rating_grade(composite)
+        scores['pd_1y'], scores['pd_3y'] = SACRMEngine.calculate_pd_batch(composite)
+        return scores
+
+# Array view of the country table for vectorized lookups; the dict stays for the scalar API
+_COUNTRY_NAMES = list(SACRMEngine.COUNTRY_RISK)
+_COUNTRY_SCORES = np.array(list(SACRMEngine.COUNTRY_RISK.values()), dtype=np.int16)
 
 def create_template():
     """Generate CSV template"""
@@ -141,151 +297,192 @@ def create_template():
     df = pd.DataFrame(template_data)
     return df.to_csv(index=False)
 
-def process_rating(file, company_selection):
-    """Main rating processing function"""
+# The template never changes, so write it to disk once at import and serve that file
+_TEMPLATE_PATH = os.path.join(tempfile.mkdtemp(), 'sacrm_template.csv')
+with open(_TEMPLATE_PATH, 'w', newline='') as f:
+    f.write(create_template())
+
+# Template columns with explicit dtypes, so read_csv skips type inference and ignores extra columns
+_CSV_DTYPES = {
+    'company_name': str,
+    'country': 'category',
+    'sector': 'category',
+    'revenue_usd': 'float64',
+    'ebitda_usd': 'float64',
+    'total_debt_usd': 'float64',
+    'cash_usd': 'float64',
+    'operating_cashflow_usd': 'float64',
+    'interest_expense_usd': 'float64',
+    'fx_debt_percentage': 'float64',
+    'has_bank_restructuring': 'category',
+    'payment_delays_days': 'float64',
+    'mobile_money_share': 'float64',
+    'audited_financials': 'category'
+}
+_CSV_USECOLS = list(_CSV_DTYPES)
+
+@lru_cache(maxsize=8)
+def _load_csv(file_bytes):
+    """Parse an uploaded CSV once per distinct content; callers must not mutate the result"""
+    df = pd.read_csv(
+        io.BytesIO(file_bytes),
+        engine='c',
+        usecols=_CSV_USECOLS,
+        dtype=_CSV_DTYPES
+    )
+    # Normalize yes/no flags to booleans once, so scoring never touches the strings
+    for col in ('has_bank_restructuring', 'audited_financials'):
+        df[col] = _yes_flags(df[col])
+    # Index by name for O(1) company lookups; a repeated name always rated its first row
+    df = df.set_index('company_name', drop=False)
+    return df[~df.index.duplicated()]
+
+@lru_cache(maxsize=8)
+def _rate_csv(file_bytes):
+    """Score all companies of an uploaded CSV, cached per distinct content"""
+    df = _load_csv(file_bytes)
+    return df.join(SACRMEngine.calculate_all(df))
+
+# Static chart pieces (labels, colours, layouts, the PD curve) as plain dicts; _build_charts
+# builds each figure from a dict spec so plotly doesn't copy or re-walk a template figure
+_ENGINE_LABELS = ['Sovereign Risk (30%)', 'Financial Strength (25%)', 
+                  'Bank Behavior (20%)', 'Alt Data (15%)', 'Stress Test (10%)']
+_ENGINE_COLORS = ['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444']
+_ENGINE_LAYOUT = {
+    'title': {'text': '5-Engine Score Breakdown'},
+    'xaxis': {'title': {'text': 'Score (0-100)'}},
+    'height': 400,
+    'showlegend': False
+}
+
+_RADAR_THETA = ['Sovereign', 'Financial', 'Behavior', 'Alt Data', 'Stress']
+_RADAR_LAYOUT = {
+    'polar': {'radialaxis': {'visible': True, 'range': [0, 100]}},
+    'showlegend': False,
+    'title': {'text': 'Risk Profile Radar'},
+    'height': 400
+}
+
+_COMPARE_LABELS = ['Composite Score', 'Sovereign', 'Financial', 'Behavior', 'Alt Data', 'Stress']
+_COMPARE_COLORS = ['#1e40af', '#3b82f6', '#60a5fa', '#93c5fd', '#bfdbfe', '#dbeafe']
+_COMPARISON_LAYOUT = {
+    'title': {'text': 'Score Overview'},
+    'yaxis': {'title': {'text': 'Score (0-100)'}},
+    'height': 400,
+    'showlegend': False
+}
+
+_PD_CURVE_TRACE = {
+    'type': 'scatter',
+    'x': _PD_SCORES,
+    'y': _PD_CURVE,
+    'mode': 'lines',
+    'line': {'color': '#ef4444', 'width': 2},
+    'name': 'PD Curve'
+}
+_PD_LAYOUT = {
+    'title': {'text': 'Probability of Default Curve'},
+    'xaxis': {'title': {'text': 'SACRM Score'}},
+    'yaxis': {'title': {'text': '1-Year PD (%)'}},
+    'height': 400
+}
+
+@lru_cache(maxsize=64)
+def _build_charts(engine_scores, composite, pd_1y):
+    """Engine, radar, comparison and PD figures for one set of rounded scores"""
+    engine_fig = go.Figure({
+        'data': [{
+            'type': 'bar',
+            'x': list(engine_scores),
+            'y': _ENGINE_LABELS,
+            'orientation': 'h',
+            'marker': {'color': _ENGINE_COLORS}
+        }],
+        'layout': _ENGINE_LAYOUT
+    }, skip_invalid=True)
     
-    if file is None:
-        return (
-            "❌ Please upload a CSV file",
-            None, None, None, None, None
-        )
+    radar_fig = go.Figure({
+        'data': [{
+            'type': 'scatterpolar',
+            'r': list(engine_scores),
+            'theta': _RADAR_THETA,
+            'fill': 'toself',
+            'line': {'color': '#3b82f6'}
+        }],
+        'layout': _RADAR_LAYOUT
+    }, skip_invalid=True)
     
-    try:
-        # Read CSV
-        df = pd.read_csv(file.name)
-        
-        if company_selection not in df['company_name'].values:
-            company_selection = df['company_name'].iloc[0]
-        
-        # Get company data
-        company_data = df[df['company_name'] == company_selection].iloc[0].to_dict()
-        
-        # Calculate all scores
-        crs = SACRMEngine.calculate_crs(company_data['country'])
-        fss = SACRMEngine.calculate_fss(company_data)
-        ocbs = SACRMEngine.calculate_ocbs(company_data)
-        brs = SACRMEngine.calculate_brs(company_data)
-        sss = SACRMEngine.calculate_sss(company_data, fss)
-        
-        composite = SACRMEngine.calculate_composite(crs, fss, ocbs, brs, sss)
-        rating = SACRMEngine.get_rating_grade(composite)
-        pd_1y, pd_3y = SACRMEngine.calculate_pd(composite)
-        
-        # Create summary
-        summary = f"""
+    comparison_fig = go.Figure({
+        'data': [{
+            'type': 'bar',
+            'x': _COMPARE_LABELS,
+            'y': [composite, *engine_scores],
+            'marker': {'color': _COMPARE_COLORS}
+        }],
+        'layout': _COMPARISON_LAYOUT
+    }, skip_invalid=True)
+    
+    pd_fig = go.Figure({
+        'data': [
+            _PD_CURVE_TRACE,
+            {
+                'type': 'scatter',
+                'x': [composite],
+                'y': [pd_1y],
+                'mode': 'markers',
+                'marker': {'size': 15, 'color': '#3b82f6'},
+                'name': 'This Company'
+            }
+        ],
+        'layout': _PD_LAYOUT
+    }, skip_invalid=True)
+    
+    return engine_fig, radar_fig, comparison_fig, pd_fig
+
+# Report templates, filled with str.format_map in process_rating
+_SUMMARY_TMPL = """
 # 🏦 SACRM 3.0 RATING REPORT
 
-## Company: {company_data['company_name']}
-**Sector:** {company_data['sector']} | **Country:** {company_data['country']}
+## Company: {company_name}
+**Sector:** {sector} | **Country:** {country}
 
 ---
 
 ## 📊 RATING SUMMARY
 - **SACRM Rating:** **{rating}**
 - **Composite Score:** {composite}/100
-- **PD (1-Year):** {pd_1y}%
-- **PD (3-Year):** {pd_3y}%
+- **PD (1-Year):** {pd_1y:.2f}%
+- **PD (3-Year):** {pd_3y:.2f}%
 
 ---
 
 ## 🔧 ENGINE SCORES
 | Engine | Weight | Score |
 |--------|--------|-------|
-| Sovereign Risk | 30% | {round(crs, 1)}/100 |
-| Financial Strength | 25% | {round(fss, 1)}/100 |
-| Bank Behavior | 20% | {round(ocbs, 1)}/100 |
-| Alternative Data | 15% | {round(brs, 1)}/100 |
-| Stress Testing | 10% | {round(sss, 1)}/100 |
+| Sovereign Risk | 30% | {crs}/100 |
+| Financial Strength | 25% | {fss}/100 |
+| Bank Behavior | 20% | {ocbs}/100 |
+| Alternative Data | 15% | {brs}/100 |
+| Stress Testing | 10% | {sss}/100 |
 
 ---
 
 ## 💰 KEY RATIOS
-- **Debt/EBITDA:** {company_data['total_debt_usd'] / max(company_data['ebitda_usd'], 1):.2f}x
-- **Interest Coverage:** {company_data['ebitda_usd'] / max(company_data['interest_expense_usd'], 1):.2f}x
-- **OCF/Debt:** {company_data['operating_cashflow_usd'] / max(company_data['total_debt_usd'], 1):.2%}
-- **FX Exposure:** {company_data['fx_debt_percentage']:.0f}%
+- **Debt/EBITDA:** {debt_ebitda:.2f}x
+- **Interest Coverage:** {interest_cov:.2f}x
+- **OCF/Debt:** {ocf_debt:.2%}
+- **FX Exposure:** {fx_debt_percentage:.0f}%
 """
-        
-        # Create engine bar chart
-        engine_fig = go.Figure(data=[
-            go.Bar(
-                x=[round(crs, 1), round(fss, 1), round(ocbs, 1), round(brs, 1), round(sss, 1)],
-                y=['Sovereign Risk (30%)', 'Financial Strength (25%)', 
-                   'Bank Behavior (20%)', 'Alt Data (15%)', 'Stress Test (10%)'],
-                orientation='h',
-                marker=dict(color=['#3b82f6', '#10b981', '#8b5cf6', '#f59e0b', '#ef4444'])
-            )
-        ])
-        engine_fig.update_layout(
-            title='5-Engine Score Breakdown',
-            xaxis_title='Score (0-100)',
-            height=400,
-            showlegend=False
-        )
-        
-        # Create radar chart
-        radar_fig = go.Figure(data=go.Scatterpolar(
-            r=[round(crs, 1), round(fss, 1), round(ocbs, 1), round(brs, 1), round(sss, 1)],
-            theta=['Sovereign', 'Financial', 'Behavior', 'Alt Data', 'Stress'],
-            fill='toself',
-            line_color='#3b82f6'
-        ))
-        radar_fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-            showlegend=False,
-            title='Risk Profile Radar',
-            height=400
-        )
-        
-        # Create comparison chart
-        comparison_fig = go.Figure(data=[
-            go.Bar(
-                x=['Composite Score', 'Sovereign', 'Financial', 'Behavior', 'Alt Data', 'Stress'],
-                y=[composite, round(crs, 1), round(fss, 1), round(ocbs, 1), round(brs, 1), round(sss, 1)],
-                marker_color=['#1e40af', '#3b82f6', '#60a5fa', '#93c5fd', '#bfdbfe', '#dbeafe']
-            )
-        ])
-        comparison_fig.update_layout(
-            title='Score Overview',
-            yaxis_title='Score (0-100)',
-            height=400,
-            showlegend=False
-        )
-        
-        # Create PD curve
-        scores = np.linspace(40, 95, 50)
-        pds = [max(0.1, 50 * np.exp(-0.05 * s)) for s in scores]
-        
-        pd_fig = go.Figure()
-        pd_fig.add_trace(go.Scatter(
-            x=scores, y=pds,
-            mode='lines',
-            line=dict(color='#ef4444', width=2),
-            name='PD Curve'
-        ))
-        pd_fig.add_trace(go.Scatter(
-            x=[composite], y=[pd_1y],
-            mode='markers',
-            marker=dict(size=15, color='#3b82f6'),
-            name='This Company'
-        ))
-        pd_fig.update_layout(
-            title='Probability of Default Curve',
-            xaxis_title='SACRM Score',
-            yaxis_title='1-Year PD (%)',
-            height=400
-        )
-        
-        # Generate downloadable report
-        report_text = f"""
+
+_REPORT_TMPL = """
 SACRM 3.0 CREDIT RATING REPORT
-{'=' * 60}
+============================================================
 
 COMPANY INFORMATION
-Company Name: {company_data['company_name']}
-Sector: {company_data['sector']}
-Country: {company_data['country']}
-Report Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+Company Name: {company_name}
+Sector: {sector}
+Country: {country}
+Report Date: {report_date:%Y-%m-%d %H:%M:%S}
 
 RATING SUMMARY
 SACRM Rating: {rating}
@@ -293,32 +490,73 @@ Composite Score: {composite}/100
 Rating Outlook: Stable
 
 PROBABILITY OF DEFAULT
-1-Year PD: {pd_1y}%
-3-Year PD: {pd_3y}%
+1-Year PD: {pd_1y:.2f}%
+3-Year PD: {pd_3y:.2f}%
 
 ENGINE SCORES
-Sovereign & Macro Risk (30%): {round(crs, 1)}/100
-Financial Strength (25%): {round(fss, 1)}/100
-African Financier Behavior (20%): {round(ocbs, 1)}/100
-Alternative & Behavioral Data (15%): {round(brs, 1)}/100
-Stress & Forward-Looking (10%): {round(sss, 1)}/100
+Sovereign & Macro Risk (30%): {crs}/100
+Financial Strength (25%): {fss}/100
+African Financier Behavior (20%): {ocbs}/100
+Alternative & Behavioral Data (15%): {brs}/100
+Stress & Forward-Looking (10%): {sss}/100
 
 KEY FINANCIAL METRICS
-Revenue (USD): ${company_data['revenue_usd']:,.0f}
-EBITDA (USD): ${company_data['ebitda_usd']:,.0f}
-Total Debt (USD): ${company_data['total_debt_usd']:,.0f}
-Cash (USD): ${company_data['cash_usd']:,.0f}
+Revenue (USD): ${revenue_usd:,.0f}
+EBITDA (USD): ${ebitda_usd:,.0f}
+Total Debt (USD): ${total_debt_usd:,.0f}
+Cash (USD): ${cash_usd:,.0f}
 
 FINANCIAL RATIOS
-Debt/EBITDA: {company_data['total_debt_usd'] / max(company_data['ebitda_usd'], 1):.2f}x
-Interest Coverage: {company_data['ebitda_usd'] / max(company_data['interest_expense_usd'], 1):.2f}x
-Operating Cashflow/Debt: {company_data['operating_cashflow_usd'] / max(company_data['total_debt_usd'], 1):.2%}
-FX Debt Exposure: {company_data['fx_debt_percentage']:.0f}%
+Debt/EBITDA: {debt_ebitda:.2f}x
+Interest Coverage: {interest_cov:.2f}x
+Operating Cashflow/Debt: {ocf_debt:.2%}
+FX Debt Exposure: {fx_debt_percentage:.0f}%
 
-{'=' * 60}
+============================================================
 Generated by SACRM 3.0 - Strategix Capital
 Africa-Centric • Transparent • Predictive • Automated
 """
+
+def process_rating(file, company_selection):
+    """Main rating processing function"""
+    
+    if file is None:
+        return (
+            "❌ Please upload a CSV file",
+            None, None, None, None, None
+        )
+    
+    try:
+        # Read and score the whole CSV, cached on its bytes so re-uploads of the
+        # same file (which Gradio saves under a new temp path) reuse the result
+        with open(file.name, 'rb') as f:
+            df = _rate_csv(f.read())
+        
+        if company_selection not in df.index:
+            company_selection = df.index[0]
+        
+        # Get company data and its precomputed scores
+        company_data = df.loc[company_selection].to_dict()
+        
+        composite = company_data['composite']
+        pd_1y = company_data['pd_1y']
+        
+        # Engine scores and PDs stay full precision internally; round only for display
+        engine_scores = [round(company_data[key], 1) for key in _ENGINE_KEYS]
+        
+        # Template fields: rounded scores and the report date layered over the company
+        # row (key ratios come precomputed from score_frame) without copying it
+        display = dict(zip(_ENGINE_KEYS, engine_scores), report_date=datetime.now())
+        fields = ChainMap(display, company_data)
+        
+        # Create summary
+        summary = _SUMMARY_TMPL.format_map(fields)
+        
+        # Create charts (cached per score set, so re-rating a company reuses them)
+        engine_fig, radar_fig, comparison_fig, pd_fig = _build_charts(tuple(engine_scores), composite, round(pd_1y, 2))
+        
+        # Generate downloadable report
+        report_text = _REPORT_TMPL.format_map(fields)
         
         return (
             summary,
@@ -341,7 +579,9 @@ def update_company_list(file):
         return gr.Dropdown(choices=[], value=None)
     
     try:
-        df = pd.read_csv(file.name)
+        # Same dtype as _load_csv, so numeric names come back as the strings the index holds
+        df = pd.read_csv(file.name, usecols=['company_name'], engine='c',
+                         dtype={'company_name': _CSV_DTYPES['company_name']})
         companies = df['company_name'].tolist()
         return gr.Dropdown(choices=companies, value=companies[0] if companies else None)
     except:
@@ -399,6 +639,9 @@ with gr.Blocks(theme=gr.themes.Soft(), title="SACRM 3.0 Rating Engine") as app:
             
             download_btn = gr.Button("📥 Show Downloadable Report", variant="secondary")
             
+            # Last generated report, so showing it never re-runs the rating
+            last_report = gr.State("")
+            
             # Event handlers
             file_upload.change(
                 fn=update_company_list,
@@ -409,11 +652,15 @@ with gr.Blocks(theme=gr.themes.Soft(), title="SACRM 3.0 Rating Engine") as app:
             generate_btn.click(
                 fn=process_rating,
                 inputs=[file_upload, company_dropdown],
-                outputs=[rating_summary, engine_chart, radar_chart, comparison_chart, pd_chart, report_download]
+                outputs=[rating_summary, engine_chart, radar_chart, comparison_chart, pd_chart, last_report]
+            ).then(
+                fn=lambda: gr.update(visible=False),
+                outputs=[report_download]
             )
             
             download_btn.click(
-                fn=lambda: gr.update(visible=True),
+                fn=lambda report: gr.update(visible=True, value=report),
+                inputs=[last_report],
                 outputs=[report_download]
             )
         
@@ -453,7 +700,7 @@ with gr.Blocks(theme=gr.themes.Soft(), title="SACRM 3.0 Rating Engine") as app:
             template_file = gr.File(label="Template File")
             
             template_btn.click(
-                fn=lambda: gr.File(value=io.StringIO(create_template()), visible=True),
+                fn=lambda: gr.File(value=_TEMPLATE_PATH, visible=True),
                 outputs=[template_file]
             )
         
@@ -0,0 +1,151 @@
+import io
+import os
+import tempfile
+import types
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app import SACRMEngine, _load_csv, process_rating, update_company_list
+
+CSV_HEADER = (b"company_name,country,sector,revenue_usd,ebitda_usd,total_debt_usd,cash_usd,"
+              b"operating_cashflow_usd,interest_expense_usd,fx_debt_percentage,"
+              b"has_bank_restructuring,payment_delays_days,mobile_money_share,audited_financials\n")
+
+
+def make_row(**overrides):
+    """The template's first company, with overrides"""
+    row = {
+        'company_name': 'Example Company Ltd', 'country': 'Kenya', 'sector': 'Manufacturing',
+        'revenue_usd': 50000000.0, 'ebitda_usd': 8000000.0, 'total_debt_usd': 25000000.0,
+        'cash_usd': 5000000.0, 'operating_cashflow_usd': 10000000.0,
+        'interest_expense_usd': 1500000.0, 'fx_debt_percentage': 45.0,
+        'has_bank_restructuring': 'no', 'payment_delays_days': 30.0,
+        'mobile_money_share': 75.0, 'audited_financials': 'yes'
+    }
+    row.update(overrides)
+    return row
+
+
+def score_rows(*rows):
+    """score_frame over rows, with the yes/no flags as booleans like _load_csv gives it"""
+    df = pd.DataFrame(list(rows))
+    for col in ('has_bank_restructuring', 'audited_financials'):
+        df[col] = df[col].eq('yes')
+    return SACRMEngine.score_frame(df)
+
+
+class FinancialStrengthTest(unittest.TestCase):
+
+    def test_blank_inputs_earn_no_points(self):
+        # Template row: +5 debt, +15 coverage, +10 OCF, +3 liquidity
+        cases = [
+            ({}, 83),
+            ({'interest_expense_usd': np.nan}, 68),
+            ({'operating_cashflow_usd': np.nan}, 73),
+            ({'cash_usd': np.nan}, 80),
+            ({'ebitda_usd': np.nan}, 63),
+        ]
+        rows = [make_row(**overrides) for overrides, _ in cases]
+        expected = [fss for _, fss in cases]
+        self.assertEqual([SACRMEngine.calculate_fss(row) for row in rows], expected)
+        self.assertEqual(score_rows(*rows)['fss'].tolist(), expected)
+
+
+class LadderBoundaryTest(unittest.TestCase):
+
+    def assert_scores(self, column, score, field, cases):
+        rows = [make_row(**{field: value}) for value, _ in cases]
+        expected = [points for _, points in cases]
+        self.assertEqual([score(row) for row in rows], expected)
+        self.assertEqual(score_rows(*rows)[column].tolist(), expected)
+
+    def test_payment_delays(self):
+        self.assert_scores('ocbs', SACRMEngine.calculate_ocbs, 'payment_delays_days', [
+            (29, 90), (30, 85), (59, 85), (60, 80), (61, 70), (90, 70), (91, 65), (np.nan, 80)
+        ])
+
+    def test_mobile_money_share(self):
+        self.assert_scores('brs', SACRMEngine.calculate_brs, 'mobile_money_share', [
+            (20, 80), (21, 85), (40, 85), (41, 90), (60, 90), (61, 95), (np.nan, 80)
+        ])
+
+    def test_fx_debt_percentage(self):
+        self.assert_scores('brs', SACRMEngine.calculate_brs, 'fx_debt_percentage', [
+            (29, 100), (30, 95), (60, 95), (61, 85), (np.nan, 95)
+        ])
+
+
+class YesNoFlagTest(unittest.TestCase):
+
+    CSV = CSV_HEADER + b"Flagged Ltd,Kenya,Banking,1e7,2e6,5e6,1e6,2e6,3e5,40, Yes ,20,50,NO\n"
+
+    def test_scalar_and_batch_agree_on_a_loaded_row(self):
+        df = _load_csv(self.CSV)
+        row = df.iloc[0].to_dict()
+        scores = SACRMEngine.score_frame(df).iloc[0]
+        self.assertEqual(SACRMEngine.calculate_ocbs(row), scores['ocbs'])
+        self.assertEqual(SACRMEngine.calculate_brs(row), scores['brs'])
+
+    def test_raw_read_csv_frame_matches_scalar_path(self):
+        csv = (CSV_HEADER
+               + b"Flagged Ltd,Kenya,Banking,1e7,2e6,5e6,1e6,2e6,3e5,40, Yes ,20,50,NO\n"
+               + b"Clean Ltd,Ghana,Banking,1e7,2e6,5e6,1e6,2e6,3e5,40,no,20,50,yes\n"
+               + b"Mixed Ltd,Egypt,Banking,1e7,2e6,5e6,1e6,2e6,3e5,40,yes,20,50,no\n")
+        df = pd.read_csv(io.BytesIO(csv))
+        scores = SACRMEngine.calculate_all(df)
+        for (_, row), (_, batch) in zip(df.iterrows(), scores.iterrows()):
+            self.assertEqual(SACRMEngine.calculate_ocbs(row), batch['ocbs'])
+            self.assertEqual(SACRMEngine.calculate_brs(row), batch['brs'])
+
+    def test_string_flags_still_accepted(self):
+        row = make_row(has_bank_restructuring='Yes', audited_financials='no')
+        self.assertEqual(SACRMEngine.calculate_ocbs(row), 70)
+        self.assertEqual(SACRMEngine.calculate_brs(row), 75)
+
+
+class CompanySelectionTest(unittest.TestCase):
+
+    def test_numeric_names_select_the_chosen_company(self):
+        csv = (CSV_HEADER
+               + b"1001,Kenya,Banking,1e7,2e6,5e6,1e6,2e6,3e5,40,no,20,50,yes\n"
+               + b"1002,Ghana,Banking,1e7,2e6,5e6,1e6,2e6,3e5,40,no,20,50,yes\n")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'companies.csv')
+            with open(path, 'wb') as f:
+                f.write(csv)
+            upload = types.SimpleNamespace(name=path)
+            dropdown = update_company_list(upload)
+            summary = process_rating(upload, dropdown.choices[1][1])[0]
+        self.assertIn('1002', summary)
+        self.assertIn('Ghana', summary)
+
+
+class ProbabilityOfDefaultTest(unittest.TestCase):
+
+    def test_scalar_and_batch_agree(self):
+        scores = [np.nan, 40.0, 62.5, 150.0]
+        pd_1y, pd_3y = SACRMEngine.calculate_pd_batch(scores)
+        scalar = np.array([SACRMEngine.calculate_pd(score) for score in scores])
+        np.testing.assert_allclose(scalar, np.column_stack([pd_1y, pd_3y]))
+
+    def test_nan_score_gets_the_floor(self):
+        self.assertEqual(SACRMEngine.calculate_pd(np.nan)[0], 0.1)
+        self.assertEqual(SACRMEngine.calculate_pd_batch([np.nan])[0].tolist(), [0.1])
+
+
+class RatingGradeTest(unittest.TestCase):
+
+    def test_nan_composite_is_graded_b_minus(self):
+        grades = SACRMEngine.get_rating_grade(np.array([np.nan, 44.9, 45.0, 90.0]))
+        self.assertEqual(grades.tolist(), ['B-', 'B-', 'B', 'AAA'])
+
+    def test_nan_scalar_is_graded_b_minus(self):
+        self.assertEqual(SACRMEngine.get_rating_grade(float('nan')), 'B-')
+        self.assertEqual(SACRMEngine.get_rating_grade(np.float64('nan')), 'B-')
+        self.assertEqual(SACRMEngine.get_rating_grade(89.9), 'AA')
+
+
+if __name__ == "__main__":
+    unittest.main()